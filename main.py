@@ -1,89 +1,237 @@
 import streamlit as st
+import atexit
+import hashlib
+import io
+import os
 import re
-import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from urllib.parse import urljoin
+import pyarrow as pa
+from urllib.parse import ParseResult, urljoin, urlparse
 
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from scraper import build_driver, fetch_one, fetch_static, scroll_and_capture
+
 # --- 1. Core Functions ---
 
+XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+def _driver_is_alive(driver: webdriver.Chrome) -> bool:
+    """Checks whether a cached driver's browser is still responding, quitting it if not."""
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        # Streamlit drops a driver that fails validation without closing it; shut down its processes here.
+        atexit.unregister(driver.quit)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        return False
+
+@st.cache_resource(show_spinner="Starting browser...", validate=_driver_is_alive)
+def get_driver() -> webdriver.Chrome:
+    """Returns a Chrome session that persists across reruns, so the browser boots once rather than per scrape."""
+    driver = build_driver()
+    atexit.register(driver.quit)
+    return driver
+
+@st.cache_resource
+def get_driver_lock() -> threading.Lock:
+    """Serialises access to the shared driver, since a WebDriver session is not thread-safe."""
+    return threading.Lock()
+
 @st.cache_data(show_spinner="Scraping website with advanced scrolling...")
 def get_page_source(url: str) -> str:
-    """Fetches the full HTML of a page using Selenium, including lazy-loaded content."""
+    """Fetches the full HTML of a page, falling back to Selenium for JavaScript-rendered and lazy-loaded content."""
+    html = fetch_static(url)
+    if html is not None: return html
     try:
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-
-        service = Service()
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.get(url)
-
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        for _ in range(5):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height: break
-            last_height = new_height
-
-        html = driver.page_source
-        driver.quit()
-        return html
+        with get_driver_lock():
+            return scroll_and_capture(get_driver(), url)
     except Exception as e:
         st.error(f"An error occurred while scraping: {e}")
         return ""
 
+@st.cache_data(show_spinner="Scraping websites in parallel...")
+def get_pages(urls: tuple[str, ...]) -> dict[str, str]:
+    """Fetches several pages concurrently, one Selenium session per worker process."""
+    try:
+        # Workers only run code from the scraper module. Fork is pinned because spawn and forkserver
+        # would re-execute this Streamlit script in every worker; platforms without fork scrape serially.
+        # Unlike Pool.map, the executor raises BrokenProcessPool if a worker dies, so we fall back instead of hanging.
+        # Leaving the block shuts workers down normally, letting them quit their drivers.
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=min(len(urls), os.cpu_count() or 1), mp_context=context) as executor:
+            results = list(executor.map(fetch_one, urls))
+    except Exception as e:
+        st.warning(f"Parallel scraping is unavailable ({e}); scraping the pages one at a time.")
+        return {url: get_page_source(url) for url in urls}
+
+    pages = {}
+    for url, (html, error) in zip(urls, results):
+        if error: st.error(f"An error occurred while scraping {url}: {error}")
+        pages[url] = html
+    return pages
+
+def content_key(html: str) -> str:
+    """Returns a short digest of the page HTML, used as the cache key in place of the HTML itself."""
+    return hashlib.blake2b(html.encode(), digest_size=16).hexdigest()
+
+# Functions taking the page as `_html` or `_doc` are keyed on `page_key`; Streamlit skips hashing underscored arguments.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def parse_dom(_html: str, page_key: str):
+    """Parses page HTML into an lxml tree once per page so extractions can reuse it."""
+    # lxml rejects str input that carries an XML encoding declaration, which some XHTML pages send.
+    return lxml_html.fromstring(XML_DECLARATION_RE.sub('', _html, count=1))
+
+# Exact descriptions (after lower-casing and stripping), resolved with a single dict lookup.
+DESCRIPTION_MAP = {
+    "the table": ("table", "table_data"), "table": ("table", "table_data"), "all tables": ("table", "table_data"),
+    "all images": ("img", "src"), "images": ("img", "src"),
+    "all links": ("a", "href"), "links": ("a", "href"), "all urls": ("a", "href"),
+    "entire data": ("body", "text_block"), "all data": ("body", "text_block"), "all content": ("body", "text_block"),
+    "all paragraphs": ("p", "text_block"), "all headings": ("h1, h2, h3", "text"), "all list items": ("li", "text"),
+}
+# Keywords matched anywhere in a description, in priority order.
+KEYWORD_RULES = [
+    (("table",), ("table", "table_data")),
+    (("image",), ("img", "src")),
+    (("link", "url"), ("a", "href")),
+    (("entire data", "all data", "all content"), ("body", "text_block")),
+    (("all paragraph",), ("p", "text_block")),
+]
+# The lookahead reports overlapping matches, so every keyword is found in one scan.
+KEYWORD_RE = re.compile("(?=(" + "|".join(re.escape(k) for keywords, _ in KEYWORD_RULES for k in keywords) + "))")
+ID_RE = re.compile(r"id\s['\"]([^'\"]+)['\"]")
+CLASS_RE = re.compile(r"class\s['\"]([^'\"]+)['\"]")
+BARE_TAG_RE = re.compile(r'^[a-zA-Z0-9]+$')
+
 def description_to_selector(description: str) -> tuple[str | None, str]:
     """Converts a natural language description into a CSS selector and a result type."""
     description = description.lower().strip()
     result_type = 'text'
-    query_key = description
-    
-    if "table" in description:
-        return "table", "table_data"
-
-    if "image" in description:
-        result_type = 'src'
-        query_key = "all images"
-    elif "link" in description or "url" in description:
-        result_type = 'href'
-        query_key = "all links"
-    elif any(phrase in description for phrase in ["entire data", "all data", "all content"]):
-        return "body", "text_block"
-    elif "all paragraph" in description:
-        return "p", "text_block"
-
-    keyword_map = {
-        "all links": "a", "all paragraphs": "p", "all headings": "h1, h2, h3",
-        "all images": "img", "all list items": "li",
-    }
-    if query_key in keyword_map: return keyword_map[query_key], result_type
-
-    id_match = re.search(r"id\s['\"]([^'\"]+)['\"]", description)
+
+    if description in DESCRIPTION_MAP: return DESCRIPTION_MAP[description]
+
+    found = set(KEYWORD_RE.findall(description))
+    if found:
+        for keywords, match in KEYWORD_RULES:
+            if found.intersection(keywords): return match
+
+    id_match = ID_RE.search(description)
     if id_match: return f"#{id_match.group(1)}", result_type
 
-    class_match = re.search(r"class\s['\"]([^'\"]+)['\"]", description)
+    class_match = CLASS_RE.search(description)
     if class_match: return f".{class_match.group(1).replace(' ', '.')}", result_type
     
-    if ' ' not in description and re.match(r'^[a-zA-Z0-9]+$', description):
+    if ' ' not in description and BARE_TAG_RE.match(description):
         return description, 'text'
 
     return None, result_type
 
+# Plain tag selectors produced by description_to_selector; these skip the CSS engine.
+TAG_SELECTORS = {
+    "a": ("a",), "img": ("img",), "p": ("p",), "li": ("li",),
+    "h1, h2, h3": ("h1", "h2", "h3"),
+}
+
+@st.cache_resource
+def compile_selector(selector: str) -> CSSSelector:
+    """Compiles a CSS selector once so repeated extractions reuse it."""
+    return CSSSelector(selector)
+
+@st.cache_resource
+def compile_attribute_xpath(selector: str, attr: str) -> etree.XPath | None:
+    """Compiles an XPath returning `attr` of every element a CSS selector matches, or None for union selectors."""
+    path = compile_selector(selector).path
+    if '|' in path: return None
+    return etree.XPath(f"{path}/@{attr}", smart_strings=False)
+
+def select_attribute(doc, selector: str, attr: str) -> list[str]:
+    """Returns the attribute values of the matching elements, collected by libxml2 in a single query."""
+    xpath = compile_attribute_xpath(selector, attr)
+    if xpath is None: return [el.get(attr, '') for el in select_elements(doc, selector)]
+    return xpath(doc)
+
+def select_elements(doc, selector: str) -> list:
+    """Returns the elements matching a selector, iterating by tag directly when the selector is a tag family."""
+    if selector in TAG_SELECTORS: return list(doc.iter(*TAG_SELECTORS[selector]))
+    return compile_selector(selector)(doc)
+
+def extract_text_block(doc, selector: str) -> str:
+    """Joins the text of the elements matching a selector, letting libxml2 walk the tree."""
+    if selector == 'body':
+        body = doc.find('body')
+        texts = (body if body is not None else doc).xpath('.//text()[not(ancestor::script or ancestor::style)]')
+        return ''.join(texts).strip()
+    return "\n\n".join(filter(None, (el.text_content().strip() for el in select_elements(doc, selector))))
+
+def fast_join(base: str, base_parsed: ParseResult, href: str) -> str:
+    """Resolves a link against the page URL, short-circuiting the common forms that don't need urljoin."""
+    if href.startswith(('http://', 'https://')): return href
+    if href.startswith('//'):
+        if len(href) > 2: return f"{base_parsed.scheme}:{href}"
+    elif href.startswith('/') and '/.' not in href: return f"{base_parsed.scheme}://{base_parsed.netloc}{href}"
+    return urljoin(base, href)
+
+def filter_srcs(srcs: list[str], base: str) -> list[str]:
+    """Drops empty and inline-GIF placeholder image sources and resolves the rest against the page URL."""
+    base_parsed = urlparse(base)
+    return [fast_join(base, base_parsed, src) for src in srcs if src and 'data:image/gif;base64' not in src]
+
+def resolve_hrefs(hrefs: list[str], base: str) -> list[str]:
+    """Drops empty links and resolves the rest against the page URL."""
+    base_parsed = urlparse(base)
+    return [fast_join(base, base_parsed, href) for href in hrefs if href]
+
+def results_frame(values: list[str]) -> pd.DataFrame:
+    """Wraps extracted strings in a single Arrow-backed column, avoiding an object-dtype copy."""
+    return pd.DataFrame({'results': pd.array(pa.array(values, type=pa.string()), dtype=pd.ArrowDtype(pa.string()))})
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def df_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Encodes a results table as CSV once, instead of on every rerun of the results view."""
+    return df.to_csv(index=False).encode('utf-8')
+
+def read_tables(doc) -> list[pd.DataFrame]:
+    """Parses the page's tables with pandas, handing it only the top-level <table> subtrees rather than the whole page."""
+    tables = doc.xpath('//table[not(ancestor::table)]')
+    table_html = ''.join(lxml_html.tostring(table, encoding='unicode', with_tail=False) for table in tables)
+    return pd.read_html(io.StringIO(f"<html><body>{table_html}</body></html>"), flavor='lxml')
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def parse_and_extract(_doc, page_key: str, selector: str, result_type: str, base_url: str, deduplicate: bool = True) -> dict:
+    """Runs one extraction and returns the session-state results it produces."""
+    if result_type == 'table_data':
+        return {'table_list': read_tables(_doc)}
+    if result_type == 'text_block':
+        return {'results_text': extract_text_block(_doc, selector)}
+
+    if result_type == 'src':
+        data_list = filter_srcs(select_attribute(_doc, selector, 'src'), base_url)
+    elif result_type == 'href':
+        data_list = resolve_hrefs(select_attribute(_doc, selector, 'href'), base_url)
+    else:
+        elements = select_elements(_doc, selector)
+        data_list = [text for text in (' '.join(el.text_content().split()) for el in elements) if text]
+    # Repeated navigation links and images add nothing; drop them while keeping page order.
+    if deduplicate and result_type in ('src', 'href'): data_list = list(dict.fromkeys(data_list))
+    return {'results_df': results_frame(data_list)}
+
 # --- 2. Streamlit Application UI ---
 
 st.set_page_config(page_title="QuantWeb Pro Scraper", layout="wide", page_icon="👑")
 
-for key in ['page_html', 'url', 'results_df', 'results_text', 'selector', 'table_list', 'description']:
+for key in ['pages', 'page_html', 'page_key', 'parsed_dom', 'url', 'results_df', 'results_text', 'selector', 'table_list', 'description']:
     if key not in st.session_state:
         st.session_state[key] = None
 
@@ -91,20 +239,34 @@ st.title("👑 QuantWeb Pro Scraper")
 st.markdown("Only for EDUCATIONAL PURPOSE. Don't Scrape unwanted site's...")
 st.markdown("---")
 
+def set_active_page(page_url: str) -> None:
+    """Makes one of the scraped pages the page to extract from and clears earlier results."""
+    st.session_state.url = page_url
+    st.session_state.page_html = st.session_state.pages.get(page_url, "")
+    st.session_state.page_key = content_key(st.session_state.page_html) if st.session_state.page_html else None
+    st.session_state.parsed_dom = parse_dom(st.session_state.page_html, st.session_state.page_key) if st.session_state.page_html else None
+    for key in ['results_df', 'results_text', 'table_list', 'description']: st.session_state[key] = None
+
 st.header("⚙️ Configuration")
 col1, col2 = st.columns([2, 1])
 with col1:
-    url = st.text_input("Enter the Website URL to Scrape:", placeholder="https://www.example.com")
+    url_input = st.text_area("Enter the Website URL(s) to Scrape (one per line):", placeholder="https://www.example.com", height=100)
 with col2:
     if st.button("Scrape Website", type="primary", use_container_width=True):
-        if url:
-            st.session_state.url = url
-            st.session_state.page_html = get_page_source(url)
-            for key in ['results_df', 'results_text', 'table_list', 'description']: st.session_state[key] = None
+        urls = list(dict.fromkeys(line.strip() for line in url_input.splitlines() if line.strip()))
+        if urls:
+            pages = {urls[0]: get_page_source(urls[0])} if len(urls) == 1 else get_pages(tuple(urls))
+            st.session_state.pages = {page_url: html for page_url, html in pages.items() if html}
+            set_active_page(next(iter(st.session_state.pages), urls[0]))
         else:
             st.warning("Please enter a URL.")
 
 if st.session_state.page_html:
+    if len(st.session_state.pages) > 1:
+        page_urls = list(st.session_state.pages)
+        selected_url = st.selectbox("Choose the page to extract from:", page_urls, index=page_urls.index(st.session_state.url))
+        if selected_url != st.session_state.url: set_active_page(selected_url)
+
     st.success(f"Successfully scraped **{st.session_state.url}**")
     
     with st.expander("View Full Page HTML"): st.code(st.session_state.page_html, language="html")
@@ -134,65 +296,54 @@ if st.session_state.page_html:
             placeholder="e.g., all images, all links, the table...",
             key="description_input"
         )
+        deduplicate = st.checkbox("Remove duplicate URLs (links and images)", value=True)
     with col4:
         if st.button("Extract Data", use_container_width=True):
-            if st.session_state.description:
+            description = st.session_state.description
+            if description:
                 with st.spinner("Parsing HTML and extracting data..."):
-                    selector, result_type = description_to_selector(st.session_state.description)
+                    selector, result_type = description_to_selector(description)
                     for key in ['results_df', 'results_text', 'table_list']: st.session_state[key] = None
                     
                     if selector:
                         st.session_state.selector = selector
-                        if result_type == 'table_data':
-                            try: st.session_state.table_list = pd.read_html(st.session_state.page_html)
-                            except Exception as e: st.error(f"Could not parse tables. Error: {e}")
-                        else:
-                            soup = BeautifulSoup(st.session_state.page_html, 'html.parser')
-                            elements = soup.select(selector)
-                            if result_type == 'text_block':
-                                all_text = [el.get_text(strip=True) for el in elements]
-                                st.session_state.results_text = "\n\n".join(filter(None, all_text))
-                            else:
-                                data_list = []
-                                for el in elements:
-                                    if result_type == 'src':
-                                        content = el.get('src', '')
-                                        if content and 'data:image/gif;base64' not in content:
-                                            data_list.append(urljoin(st.session_state.url, content))
-                                    elif result_type == 'href':
-                                        content = el.get('href', '')
-                                        if content: data_list.append(urljoin(st.session_state.url, content))
-                                    else:
-                                        content = el.get_text(strip=True, separator=' ')
-                                        if content: data_list.append(content)
-                                st.session_state.results_df = pd.DataFrame({'results': data_list})
+                        try:
+                            extracted = parse_and_extract(
+                                st.session_state.parsed_dom, st.session_state.page_key,
+                                selector, result_type, st.session_state.url, deduplicate
+                            )
+                            for key, value in extracted.items(): st.session_state[key] = value
+                        except Exception as e:
+                            what = "tables" if result_type == 'table_data' else "the page"
+                            st.error(f"Could not parse {what}. Error: {e}")
                     else:
                         st.error("Could not understand your description.")
             else:
                 st.warning("Please describe what you want to extract.")
 
-if any([st.session_state.results_df is not None, st.session_state.results_text is not None, st.session_state.table_list is not None]):
+results_df, results_text, table_list = st.session_state.results_df, st.session_state.results_text, st.session_state.table_list
+if any([results_df is not None, results_text is not None, table_list is not None]):
     st.markdown("---")
     st.header("📊 Results")
     st.info(f"Query: `{st.session_state.description}` | Method: `{st.session_state.selector}`")
 
-    if st.session_state.table_list:
-        st.markdown(f"**Found {len(st.session_state.table_list)} table(s).**")
-        for i, table_df in enumerate(st.session_state.table_list):
+    if table_list:
+        st.markdown(f"**Found {len(table_list)} table(s).**")
+        for i, table_df in enumerate(table_list):
             st.subheader(f"Table {i+1}")
             st.dataframe(table_df, use_container_width=True)
-            csv = table_df.to_csv(index=False).encode('utf-8')
+            csv = df_to_csv_bytes(table_df)
             st.download_button(f"📥 Download Table {i+1} as CSV", csv, f"table_{i+1}.csv", "text/csv", key=f'download_table_{i}')
     
-    elif st.session_state.results_text is not None:
-        st.text_area("Extracted Text", st.session_state.results_text, height=300)
-        st.download_button("📥 Download as TXT", st.session_state.results_text, "scraped_text.txt")
+    elif results_text is not None:
+        st.text_area("Extracted Text", results_text, height=300)
+        st.download_button("📥 Download as TXT", results_text, "scraped_text.txt")
     
-    elif st.session_state.results_df is not None:
-        if not st.session_state.results_df.empty:
-            st.markdown(f"**Found {len(st.session_state.results_df)} items.**")
-            st.dataframe(st.session_state.results_df, use_container_width=True)
-            csv = st.session_state.results_df.to_csv(index=False).encode('utf-8')
+    elif results_df is not None:
+        if not results_df.empty:
+            st.markdown(f"**Found {len(results_df)} items.**")
+            st.dataframe(results_df, use_container_width=True)
+            csv = df_to_csv_bytes(results_df)
             st.download_button("📥 Download as CSV", csv, "scraped_results.csv", "text/csv")
         else:
             st.warning("Found 0 items matching your query after filtering.")
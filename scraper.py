@@ -0,0 +1,150 @@
+"""Page fetching for the scraper, kept free of Streamlit so pool workers can import it by module path."""
+import multiprocessing.util
+import re
+import requests
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# A plain HTTP response shorter than this is treated as a JavaScript shell that needs a browser.
+STATIC_PAGE_MIN_LENGTH = 5000
+# Content tags whose presence marks server-rendered HTML as complete.
+CONTENT_TAG_RE = re.compile(r'<(?:p|table|article)[\s>]', re.I)
+
+# Requests that never affect the scraped HTML; Chrome drops them before they hit the network.
+# Patterns match the whole URL, so extensions keep a trailing * for query strings such as ?v=4.7.0.
+BLOCKED_URL_PATTERNS = [
+    "*.woff*", "*.ttf*", "*.otf*", "*.mp4*", "*.webm*",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*",
+]
+
+# Scroll at most this many times; each step waits until the page has been quiet for
+# SCROLL_QUIET_MS, or SCROLL_MAX_WAIT_MS at most.
+SCROLL_MAX_STEPS = 5
+SCROLL_QUIET_MS = 250
+SCROLL_MAX_WAIT_MS = 2000
+
+# Runs the whole scroll loop in the browser and calls back once a step no longer grows the page.
+# A step has settled when the DOM, the page height and the resource-timing entries are all quiet.
+SCROLL_SCRIPT = """
+const [maxSteps, quietMs, maxStepMs] = arguments;
+const done = arguments[arguments.length - 1];
+let step = 0, stepStart, stepHeight, lastChange, lastHeight, lastResources;
+const observer = new MutationObserver(() => { lastChange = performance.now(); });
+observer.observe(document.body, {childList: true, subtree: true});
+const scroll = () => {
+    stepHeight = lastHeight = document.body.scrollHeight;
+    lastResources = performance.getEntriesByType('resource').length;
+    window.scrollTo(0, stepHeight);
+    stepStart = lastChange = performance.now();
+};
+scroll();
+const timer = setInterval(() => {
+    const now = performance.now();
+    const height = document.body.scrollHeight;
+    const resources = performance.getEntriesByType('resource').length;
+    if (height !== lastHeight || resources !== lastResources) {
+        lastHeight = height;
+        lastResources = resources;
+        lastChange = now;
+    }
+    if (now - lastChange < quietMs && now - stepStart < maxStepMs) return;
+    if (height === stepHeight || ++step >= maxSteps) {
+        clearInterval(timer);
+        observer.disconnect();
+        done();
+        return;
+    }
+    scroll();
+}, 50);
+"""
+
+def build_driver() -> webdriver.Chrome:
+    """Launches a headless Chrome configured for scraping."""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-features=IsolateOrigins,site-per-process")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+
+    service = Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+def _looks_complete(html: str) -> bool:
+    """Heuristic for whether server-rendered HTML already carries the page content."""
+    if len(html) <= STATIC_PAGE_MIN_LENGTH: return False
+    return '</body>' in html.lower() and CONTENT_TAG_RE.search(html) is not None
+
+def fetch_static(url: str) -> str | None:
+    """Fetches a page over plain HTTP, returning None when it looks like it needs a browser to render."""
+    try:
+        # Stream so a non-HTML body (a PDF, a video) is never downloaded just to be rejected.
+        with requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            if 'html' not in response.headers.get('Content-Type', ''): return None
+            if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+                response.encoding = response.apparent_encoding
+            html = response.text
+    except requests.RequestException:
+        return None
+    return html if _looks_complete(html) else None
+
+def reset_browser_state(driver: webdriver.Chrome) -> None:
+    """Clears the cookies and site storage an earlier scrape left in a reused driver."""
+    # Unlike delete_all_cookies, which only covers the current domain, this clears every domain's cookies.
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    origin = driver.execute_script("return window.location.origin")
+    if origin and origin != "null":
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+def scroll_and_capture(driver: webdriver.Chrome, url: str) -> str:
+    """Loads a URL, scrolls to trigger lazy-loaded content and returns the resulting HTML."""
+    reset_browser_state(driver)
+    driver.get(url)
+    driver.set_script_timeout(SCROLL_MAX_STEPS * SCROLL_MAX_WAIT_MS / 1000 + 5)
+    driver.execute_async_script(SCROLL_SCRIPT, SCROLL_MAX_STEPS, SCROLL_QUIET_MS, SCROLL_MAX_WAIT_MS)
+    return driver.page_source
+
+# Each pool worker keeps one Chrome for all the URLs it is handed (WebDriver is not thread-safe).
+_worker_driver = None
+
+def _discard_worker_driver() -> None:
+    """Quits this worker's driver so the next URL starts a fresh browser."""
+    global _worker_driver
+    driver, _worker_driver = _worker_driver, None
+    if driver is None: return
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+def fetch_one(url: str) -> tuple[str, str]:
+    """Pool worker: fetches one page with this process's driver and returns (html, error)."""
+    global _worker_driver
+    html = fetch_static(url)
+    if html is not None: return html, ""
+    try:
+        if _worker_driver is None:
+            _worker_driver = build_driver()
+            multiprocessing.util.Finalize(None, _discard_worker_driver, exitpriority=10)
+        return scroll_and_capture(_worker_driver, url), ""
+    except WebDriverException as e:
+        # The browser may have crashed; don't hand a dead session to this worker's later URLs.
+        _discard_worker_driver()
+        return "", str(e)
+    except Exception as e:
+        return "", str(e)